@@ -1,6 +1,8 @@
 import sys
 import os
+import time
 import pytest
+from sqlalchemy import event
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -22,6 +24,42 @@ class TestConfig(Config):
     REDIS_URL = 'redis://'
 
 
+class QueryCounter:
+    """Zlicza zapytania SQL wysylane do bazy i mierzy czas ich wykonania"""
+
+    def __init__(self):
+        self.statements = []
+        self.total_time = 0.0
+        self.slowest = None
+        self._slowest_time = 0.0
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        self.total_time += elapsed
+        if self.slowest is None or elapsed > self._slowest_time:
+            self.slowest = statement
+            self._slowest_time = elapsed
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def reset(self):
+        self.statements.clear()
+        self.total_time = 0.0
+        self.slowest = None
+        self._slowest_time = 0.0
+
+    def assert_max(self, budget):
+        """Sprawdza, czy liczba zapytan nie przekroczyla budzetu"""
+        assert self.count <= budget, (
+            f'{self.count} zapytan SQL, budzet {budget}:\n' + '\n'.join(self.statements))
+
+
 @pytest.fixture(scope='function')
 def app():
     """Instancja aplikacji"""
@@ -72,4 +110,15 @@ def post_ola(session, user_ola):
     p = Post(body="Post Oli", author=user_ola, timestamp=datetime.now(timezone.utc))
     session.add(p)
     session.commit()
-    return p
\ No newline at end of file
+    return p
+
+
+@pytest.fixture(scope='function')
+def query_counter(app):
+    """Licznik zapytan SQL wykonanych w trakcie testu"""
+    counter = QueryCounter()
+    event.listen(db.engine, 'before_cursor_execute', counter.before_cursor_execute)
+    event.listen(db.engine, 'after_cursor_execute', counter.after_cursor_execute)
+    yield counter
+    event.remove(db.engine, 'before_cursor_execute', counter.before_cursor_execute)
+    event.remove(db.engine, 'after_cursor_execute', counter.after_cursor_execute)
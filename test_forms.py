@@ -5,6 +5,7 @@ import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.auth.forms import RegistrationForm
+from app.main.forms import EditProfileForm
 
 
 def test_registration_form_success(app):
@@ -62,4 +63,36 @@ def test_register_email_exist(app, user_ola):
         assert form.validate() is False
 
         assert 'email' in form.errors
-        assert 'Please use a different email address.' in form.errors['email']
\ No newline at end of file
+        assert 'Please use a different email address.' in form.errors['email']
+
+
+def test_register_username_and_email_exist(app, user_ola):
+    """Sprawdza, czy przy zajetym username i emailu oba pola dostana blad"""
+    with app.test_request_context():
+        form = RegistrationForm(
+            username='ola',
+            email='ola@email.com',
+            password='haslo',
+            password2='haslo'
+        )
+
+        assert form.validate() is False
+        assert 'Please use a different username.' in form.errors['username']
+        assert 'Please use a different email address.' in form.errors['email']
+
+
+def test_edit_profile_same_username(app, user_ola):
+    """Sprawdza, czy mozna zapisac profil bez zmiany wlasnego username"""
+    with app.test_request_context():
+        form = EditProfileForm('ola', username='ola', about_me='bla bla bla')
+
+        assert form.validate() is True
+
+
+def test_edit_profile_username_exist(app, user_ola, user_kasia):
+    """Sprawdza, czy nie mozna zmienic username na zajety przez kogos innego"""
+    with app.test_request_context():
+        form = EditProfileForm('ola', username='kasia', about_me='')
+
+        assert form.validate() is False
+        assert 'Please use a different username.' in form.errors['username']
\ No newline at end of file
@@ -37,6 +37,18 @@ def test_login_failure(client, user_ola):
     assert b'Invalid username or password' in response.data
 
 
+def test_login_unknown_user(client):
+    """Sprawdza, czy logowanie nieistniejacego uzytkownika daje ten sam blad co zle haslo"""
+    response = client.post('/auth/login', data={
+        'username': 'nieistnieje',
+        'password': 'haslo'
+    }, follow_redirects=True)
+
+    assert response.status_code == 200
+    assert b'Invalid username or password' in response.data
+    assert b'Logout' not in response.data
+
+
 def test_logout(client, user_ola):
     """Sprawdza poprawne logowanie a nastepnie wylogowanie"""
     client.post('/auth/login', data={'username': 'ola', 'password': 'ola123'})